@@ -1,26 +1,23 @@
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import quote
-import json
+import asyncio
+import aiohttp
+import orjson
+from imdb import HEADERS, fetch_next_data
 
 query = "Inception"
-search_url = f"https://www.imdb.com/find/?q={quote(query)}&s=tt&ttype=ft&ref_=fn_ft"
 
-headers = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-}
-
-response = requests.get(search_url, headers=headers, timeout=10)
-soup = BeautifulSoup(response.text, 'lxml')
-
-next_data_script = soup.find('script', id='__NEXT_DATA__', type='application/json')
-
-if next_data_script:
-    data = json.loads(next_data_script.string)
+async def main():
+    async with aiohttp.ClientSession(headers=HEADERS) as session:
+        payload = await fetch_next_data(session, query)
+    
+    if not payload:
+        print("No __NEXT_DATA__ found!")
+        return
+    
+    data = orjson.loads(payload)
     
     # Save the full JSON for inspection
-    with open('/tmp/imdb_json.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    with open('/tmp/imdb_json.json', 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     print("Full JSON saved to /tmp/imdb_json.json")
     
     # Print the structure
@@ -40,5 +37,5 @@ if next_data_script:
                 print(f"  First item type: {type(value[0])}")
                 if isinstance(value[0], dict):
                     print(f"  First item keys: {list(value[0].keys())}")
-else:
-    print("No __NEXT_DATA__ found!")
+
+asyncio.run(main())
@@ -0,0 +1,58 @@
+import re
+from typing import Optional
+from urllib.parse import quote
+
+import aiohttp
+import orjson
+import simdjson
+from selectolax.parser import HTMLParser
+
+# Headers to mimic a browser request
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+}
+
+# IMDB is a Next.js app; search results live in the __NEXT_DATA__ JSON blob
+_NEXT_DATA_RE = re.compile(rb'<script id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL)
+
+# Reusable simdjson parser (owns its buffer); documents must not outlive the parse call
+_JSON_PARSER = simdjson.Parser()
+
+
+def build_search_url(query: str) -> str:
+    """IMDB title search URL for a query"""
+    return f"https://www.imdb.com/find/?q={quote(query)}&s=tt&ttype=ft&ref_=fn_ft"
+
+def extract_next_data(content: bytes) -> Optional[bytes]:
+    """Pull the __NEXT_DATA__ JSON payload out of a Next.js HTML page"""
+    # Fast path: slice the payload straight out of the HTML (no DOM build)
+    m = _NEXT_DATA_RE.search(content)
+    if m:
+        return m.group(1)
+
+    # Fallback for markup the regex doesn't match (e.g. reordered attributes)
+    node = HTMLParser(content).css_first('script#__NEXT_DATA__')
+    return node.text().encode() if node else None
+
+def find_title_results(payload: bytes):
+    """Return props.pageProps.titleResults.results from __NEXT_DATA__, read lazily via simdjson"""
+    try:
+        # On-Demand: only the leaves we read get materialized as Python objects
+        return _JSON_PARSER.parse(payload).at_pointer('/props/pageProps/titleResults/results')
+    except (KeyError, IndexError, TypeError, ValueError, RuntimeError):
+        # Unexpected shape (or parser still in use): fall back to a full orjson parse
+        data = orjson.loads(payload)
+        return data.get('props', {}).get('pageProps', {}).get('titleResults', {}).get('results', [])
+
+async def fetch_search_page(session: aiohttp.ClientSession, query: str) -> bytes:
+    """Fetch the raw IMDB search results HTML (raises on HTTP/network errors)"""
+    async with session.get(build_search_url(query), timeout=aiohttp.ClientTimeout(total=10)) as response:
+        response.raise_for_status()
+        return await response.read()
+
+async def fetch_next_data(session: aiohttp.ClientSession, query: str) -> Optional[bytes]:
+    """Fetch an IMDB search page and return its raw __NEXT_DATA__ JSON payload"""
+    return extract_next_data(await fetch_search_page(session, query))
@@ -1,15 +1,30 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional, List
 import re
+import os
+import random
+import traceback
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-from urllib.parse import quote
-import requests
+import orjson
+import itertools
+import heapq
+import ahocorasick
+from playwright.async_api import async_playwright
+from async_lru import alru_cache
+from imdb import HEADERS, fetch_next_data, find_title_results
+
+app = FastAPI(title="LonelyMovie API", version="1.0.0", default_response_class=ORJSONResponse)
 
-app = FastAPI(title="LonelyMovie API", version="1.0.0")
+# IMDB ID / title helpers
+_IMDB_URL_RE = re.compile(r'/title/(tt\d+)')
+_IMDB_ID_RE = re.compile(r'^tt\d+$')
+_YEAR_RE = re.compile(r'\((\d{4})\)')
+_YEAR_STRIP_RE = re.compile(r'\s*\(\d{4}\)')
 
 # CORS middleware to allow React frontend
 app.add_middleware(
@@ -31,10 +46,12 @@ class SearchResponse(BaseModel):
     results: List[MovieSearchResult]
     query: str
 
+_RESULTS_ADAPTER = TypeAdapter(List[MovieSearchResult])
+
 def extract_imdb_id(url: str) -> Optional[str]:
     """Extract IMDB ID from IMDB URL"""
     # IMDB URLs typically look like: https://www.imdb.com/title/tt1234567/
-    match = re.search(r'/title/(tt\d+)', url)
+    match = _IMDB_URL_RE.search(url)
     if match:
         return match.group(1)
     return None
@@ -42,21 +59,229 @@ def extract_imdb_id(url: str) -> Optional[str]:
 def extract_title_and_year(title_text: str) -> tuple[str, Optional[str]]:
     """Extract movie title and year from text"""
     # Try to extract year in parentheses
-    year_match = re.search(r'\((\d{4})\)', title_text)
+    year_match = _YEAR_RE.search(title_text)
     year = year_match.group(1) if year_match else None
     
     # Remove year from title
-    title = re.sub(r'\s*\(\d{4}\)', '', title_text).strip()
+    title = _YEAR_STRIP_RE.sub('', title_text).strip()
     
     return title, year
 
 
+# Stream URL filtering patterns (case-insensitive, matched once per URL)
+_REJECT_RE = re.compile(
+    r'blob:|data:|chrome-extension:|about:|javascript:'
+    r'|\.(?:js|css|json|xml|woff|ttf|svg|ico)(?:\?|$)'
+    r'|/api/|/track|/log|/analytics|google|facebook|tracker',
+    re.I,
+)
+_STREAM_RE = re.compile(r'\.(?P<ext>m3u8|mp4|mkv|webm|ts)(?:\?|$)', re.I)
+_EXT_SCORES = {'m3u8': 100, 'mp4': 80, 'mkv': 70, 'webm': 60, 'ts': 40}
+
+# Quality/CDN tokens -> tag, matched in one Aho-Corasick pass over the lowercased URL
+_QUALITY_TOKENS = {
+    'master': 'master', 'playlist': 'master',
+    '1080': 'q1080', 'fhd': 'fhd',
+    '720': 'q720', 'hd': 'hd',
+    '480': 'q480',
+    'cloudflare': 'cdn', 'akamai': 'cdn', 'fastly': 'cdn', 'bunny': 'cdn', 'cloudfront': 'cdn',
+}
+_QUALITY_AC = ahocorasick.Automaton()
+for _token, _tag in _QUALITY_TOKENS.items():
+    _QUALITY_AC.add_word(_token, _tag)
+_QUALITY_AC.make_automaton()
+
+def classify_stream_url(url: str) -> tuple[bool, int]:
+    """Filter out junk URLs and rank the rest by quality (higher = better)"""
+    stream_match = _STREAM_RE.search(url)
+    if not stream_match or _REJECT_RE.search(url):
+        return False, 0
+    
+    ext = stream_match.group('ext').lower()
+    tokens = {tag for _, tag in _QUALITY_AC.iter(url.lower())}
+    score = _EXT_SCORES[ext]
+    
+    # Prefer M3U8 (adaptive streaming), then MP4
+    if ext == 'm3u8':
+        if 'master' in tokens:
+            score += 50
+        if 'q1080' in tokens or 'fhd' in tokens:
+            score += 30
+        elif 'q720' in tokens or 'hd' in tokens:
+            score += 20
+        elif 'q480' in tokens:
+            score += 10
+    elif ext == 'mp4':
+        if 'q1080' in tokens:
+            score += 25
+        elif 'q720' in tokens:
+            score += 15
+    
+    # CDN/reliable hosts (bonus points)
+    if 'cdn' in tokens:
+        score += 20
+    
+    # Long URLs often indicate proper streams
+    if len(url) > 100:
+        score += 10
+    
+    return True, score
+
+
+# Only the best-ranked candidates are kept while sniffing
+MAX_STREAM_CANDIDATES = 16
+
+def record_stream_candidate(url: str, seen: set[str], top: list[tuple[int, str]]) -> None:
+    """Dedupe a sniffed URL and push it onto the bounded top-K heap if it looks like a stream"""
+    if url in seen:
+        return
+    seen.add(url)
+    keep, score = classify_stream_url(url)
+    if not keep:
+        return
+    if len(top) >= MAX_STREAM_CANDIDATES:
+        heapq.heappushpop(top, (score, url))
+    else:
+        heapq.heappush(top, (score, url))
+
+# Chromium flags for the shared headless browser
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-web-security',
+    '--disable-features=IsolateOrigins,site-per-process',
+    '--blink-settings=imagesEnabled=false',
+]
+
+# Known player play buttons, in priority order
+PLAY_BUTTON_SELECTORS = [
+    'button.vjs-big-play-button',
+    '.vjs-big-play-button',
+    'button[aria-label*="Play" i]',
+    '.plyr__control--overlaid',
+    'button.play-button',
+    'button.play',
+    '.play-overlay',
+    '[class*="play"][class*="button"]',
+    'video',
+]
+
+# Probes the selectors in order inside the page: one round-trip, first selector with a hit wins
+FIND_PLAY_BUTTON_JS = """
+selectors => {
+    for (const selector of selectors) {
+        const element = document.querySelector(selector);
+        if (element) return element;
+    }
+    return null;
+}
+"""
+
+# Resource types the sniffer never needs; aborted unless they look like a stream
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'stylesheet', 'media', 'other'})
+
+async def block_unneeded_resources(route):
+    """Playwright route handler: drop images/fonts/CSS/etc. but let streams through"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES and not _STREAM_RE.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+@app.on_event("startup")
+async def startup():
+    """Open the shared HTTP session and headless browser (reused across requests)"""
+    app.state.http = aiohttp.ClientSession(
+        headers=HEADERS,
+        connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300),
+    )
+    app.state.pw = await async_playwright().start()
+    app.state.browser = await app.state.pw.chromium.launch(headless=True, args=BROWSER_ARGS)
+    app.state.browser_lock = asyncio.Lock()
+
+async def get_browser():
+    """Return the shared browser, relaunching it if Chromium crashed or disconnected"""
+    async with app.state.browser_lock:
+        if not app.state.browser.is_connected():
+            print("⚠️ Browser disconnected, relaunching...")
+            app.state.browser = await app.state.pw.chromium.launch(headless=True, args=BROWSER_ARGS)
+        return app.state.browser
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close the shared HTTP session and headless browser"""
+    await app.state.http.close()
+    await app.state.browser.close()
+    await app.state.pw.stop()
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+@alru_cache(maxsize=1024, ttl=600)
+async def _do_imdb_search(query: str, limit: int) -> list[MovieSearchResult]:
+    """
+    Scrape IMDB search results for a normalized query (cached for 10 minutes)
+    
+    Request errors propagate, and a page without usable __NEXT_DATA__ raises
+    LookupError, so that failed lookups are never cached.
+    """
+    rows = []
+    
+    # Make request to IMDB over the shared session
+    payload = await fetch_next_data(app.state.http, query)
+    
+    # No __NEXT_DATA__ (e.g. a bot/challenge page) is a failure, not an empty result
+    if not payload:
+        raise LookupError("No __NEXT_DATA__ found in IMDB response")
+    
+    # Navigate to search results in the JSON structure
+    try:
+        search_results = find_title_results(payload)
+        
+        for item in itertools.islice(search_results, limit):
+            try:
+                # IMDB ID is in 'index' field
+                imdb_id = item.get('index', '')
+                
+                # Title data is nested in 'listItem'
+                list_item = item.get('listItem', {})
+                title = list_item.get('titleText', list_item.get('originalTitleText', ''))
+                
+                # Year
+                year_str = str(list_item.get('releaseYear', '')) if list_item.get('releaseYear') else None
+                
+                # Media type
+                title_type = list_item.get('titleType', {})
+                type_id = title_type.get('id', 'movie')
+                media_type = "tv" if type_id in ['tvSeries', 'tvMiniSeries', 'tvSpecial'] else "movie"
+                
+                # Skip malformed rows here so one bad item can't fail the batch validation
+                if isinstance(title, str) and title and isinstance(imdb_id, str) and imdb_id:
+                    rows.append({
+                        'title': title,
+                        'imdb_id': imdb_id,
+                        'year': year_str,
+                        'url': f"https://www.imdb.com/title/{imdb_id}/",
+                        'type': media_type
+                    })
+                    
+            except Exception as parse_error:
+                print(f"Error parsing JSON result: {parse_error}")
+                continue
+        
+    except Exception as json_error:
+        raise LookupError(f"Error navigating JSON structure: {json_error}") from json_error
+    
+    # If no results from JSON, return empty
+    if not rows:
+        print("No results found in JSON data")
+    
+    # Validate every row in a single pass
+    return _RESULTS_ADAPTER.validate_python(rows)
+
 @app.get("/api/search/{query}", response_model=SearchResponse)
 async def search_movie(query: str, limit: int = 10):
     """
@@ -70,87 +295,18 @@ async def search_movie(query: str, limit: int = 10):
         SearchResponse with list of movie results
     """
     try:
-        results = []
-        
-        # IMDB search URL
-        search_url = f"https://www.imdb.com/find/?q={quote(query)}&s=tt&ttype=ft&ref_=fn_ft"
-        
-        # Headers to mimic a browser request
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-        }
-        
         try:
-            # Make request to IMDB
-            response = requests.get(search_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # IMDB uses Next.js with data in __NEXT_DATA__ script tag
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # Find the __NEXT_DATA__ script tag
-            next_data_script = soup.find('script', id='__NEXT_DATA__', type='application/json')
-            
-            if next_data_script:
-                import json
-                data = json.loads(next_data_script.string)
-                
-                # Navigate to search results in the JSON structure
-                try:
-                    # The structure is: props.pageProps.titleResults.results 
-                    page_props = data.get('props', {}).get('pageProps', {})
-                    title_results = page_props.get('titleResults', {})
-                    search_results = title_results.get('results', [])
-                    
-                    for item in search_results[:limit]:
-                        try:
-                            # IMDB ID is in 'index' field
-                            imdb_id = item.get('index', '')
-                            
-                            # Title data is nested in 'listItem'
-                            list_item = item.get('listItem', {})
-                            title = list_item.get('titleText', list_item.get('originalTitleText', ''))
-                            
-                            # Year
-                            year_str = str(list_item.get('releaseYear', '')) if list_item.get('releaseYear') else None
-                            
-                            # Media type
-                            title_type = list_item.get('titleType', {})
-                            type_id = title_type.get('id', 'movie')
-                            media_type = "tv" if type_id in ['tvSeries', 'tvMiniSeries', 'tvSpecial'] else "movie"
-                            
-                            if title and imdb_id:
-                                result = MovieSearchResult(
-                                    title=title,
-                                    imdb_id=imdb_id,
-                                    year=year_str,
-                                    url=f"https://www.imdb.com/title/{imdb_id }/",
-                                    type=media_type
-                                )
-                                results.append(result)
-                                
-                        except Exception as parse_error:
-                            print(f"Error parsing JSON result: {parse_error}")
-                            continue
-                    
-                except Exception as json_error:
-                    print(f"Error navigating JSON structure: {json_error}")
-                    # Print the available keys for debugging
-                    print(f"Available keys in pageProps: {page_props.keys() if page_props else 'None'}")
-            
-            # If no results from JSON, return empty
-            if not results:
-                print("No results found in JSON data")
-               
-        except requests.RequestException as req_error:
+            # Normalize the cache key so "Inception" and " inception " share an entry
+            # Clamp limit: islice rejects negatives, and junk values shouldn't become cache keys
+            results = await _do_imdb_search(query.lower().strip(), max(limit, 0))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as req_error:
             print(f"Request error: {req_error}")
             return SearchResponse(results=[], query=query)
+        except LookupError as parse_error:
+            print(f"Parse error: {parse_error}")
+            return SearchResponse(results=[], query=query)
         except Exception as scrape_error:
             print(f"Scraping error: {scrape_error}")
-            import traceback
             traceback.print_exc()
             return SearchResponse(results=[], query=query)
         
@@ -158,7 +314,6 @@ async def search_movie(query: str, limit: int = 10):
         
     except Exception as e:
         print(f"Error in search endpoint: {str(e)}")
-        import traceback
         traceback.print_exc()
         raise HTTPException(
             status_code=500,
@@ -166,6 +321,52 @@ async def search_movie(query: str, limit: int = 10):
         )
 
 
+@alru_cache(maxsize=1024, ttl=60)
+async def _do_tmdb_autocomplete(query: str) -> list[dict]:
+    """
+    Fetch TMDB suggestions for a normalized query (cached for 1 minute)
+    
+    The cache is keyed on the query alone and shares the pending lookup, so
+    concurrent keystrokes for the same prefix wait on a single TMDB request.
+    Non-200 responses raise so that failed lookups are never cached.
+    """
+    # TMDB API endpoint for search
+    # Note: This is a free endpoint that doesn't require API key for basic searches
+    # But for production, you should use your own API key
+    tmdb_url = f"https://api.themoviedb.org/3/search/multi?query={query}&include_adult=false&language=en-US&page=1"
+    
+    # Using TMDB without API key (limited functionality)
+    # For better results, get a free API key from https://www.themoviedb.org/settings/api
+    headers = {
+        "accept": "application/json",
+        # Add your TMDB API key here if you have one:
+        # "Authorization": "Bearer YOUR_TMDB_API_KEY"
+    }
+    
+    async with app.state.http.get(tmdb_url, headers=headers, timeout=aiohttp.ClientTimeout(total=5)) as response:
+        response.raise_for_status()
+        data = orjson.loads(await response.read())
+    
+    suggestions = []
+    
+    for item in data.get("results", []):
+        title = item.get("title") or item.get("name", "Unknown")
+        year = None
+        
+        release_date = item.get("release_date") or item.get("first_air_date")
+        if release_date:
+            year = release_date.split("-")[0]
+        
+        media_type = item.get("media_type", "movie")
+        
+        suggestions.append({
+            "title": title,
+            "year": year,
+            "type": media_type,
+            "tmdb_id": item.get("id")
+        })
+    
+    return suggestions
 
 @app.get("/api/autocomplete/{query}")
 async def autocomplete_movie(query: str, limit: int = 5):
@@ -180,53 +381,18 @@ async def autocomplete_movie(query: str, limit: int = 5):
         List of movie suggestions
     """
     try:
-        if len(query) < 2:
+        # Normalize first so padded 1-char queries (" a") don't reach TMDB or the cache
+        normalized = query.lower().strip()
+        if len(normalized) < 2:
             return {"suggestions": []}
         
-        # TMDB API endpoint for search
-        # Note: This is a free endpoint that doesn't require API key for basic searches
-        # But for production, you should use your own API key
-        tmdb_url = f"https://api.themoviedb.org/3/search/multi?query={query}&include_adult=false&language=en-US&page=1"
-        
-        async with aiohttp.ClientSession() as session:
-            # Using TMDB without API key (limited functionality)
-            # For better results, get a free API key from https://www.themoviedb.org/settings/api
-            headers = {
-                "accept": "application/json",
-                # Add your TMDB API key here if you have one:
-                # "Authorization": "Bearer YOUR_TMDB_API_KEY"
-            }
-            
-            try:
-                async with session.get(tmdb_url, headers=headers, timeout=5) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        suggestions = []
-                        
-                        for item in data.get("results", [])[:limit]:
-                            title = item.get("title") or item.get("name", "Unknown")
-                            year = None
-                            
-                            release_date = item.get("release_date") or item.get("first_air_date")
-                            if release_date:
-                                year = release_date.split("-")[0]
-                            
-                            media_type = item.get("media_type", "movie")
-                            
-                            suggestions.append({
-                                "title": title,
-                                "year": year,
-                                "type": media_type,
-                                "tmdb_id": item.get("id")
-                            })
-                        
-                        return {"suggestions": suggestions, "query": query}
-            except Exception as tmdb_error:
-                print(f"TMDB API error: {tmdb_error}")
-                # Return empty suggestions if TMDB fails
-                return {"suggestions": [], "query": query}
-        
-        return {"suggestions": [], "query": query}
+        try:
+            suggestions = await _do_tmdb_autocomplete(normalized)
+            return {"suggestions": suggestions[:limit], "query": query}
+        except Exception as tmdb_error:
+            print(f"TMDB API error: {tmdb_error}")
+            # Return empty suggestions if TMDB fails
+            return {"suggestions": [], "query": query}
         
     except Exception as e:
         print(f"Autocomplete error: {str(e)}")
@@ -246,7 +412,7 @@ async def get_imdb_info(imdb_id: str):
     """
     try:
         # Validate IMDB ID format
-        if not re.match(r'^tt\d+$', imdb_id):
+        if not _IMDB_ID_RE.match(imdb_id):
             raise HTTPException(
                 status_code=400,
                 detail="Invalid IMDB ID format. Should be like 'tt1234567'"
@@ -272,247 +438,163 @@ async def get_imdb_info(imdb_id: str):
 
 
 
-@app.get("/api/extract-stream/{imdb_id}")
-async def extract_stream_url(imdb_id: str, source: str = "vidsrc.me"):
+@alru_cache(maxsize=512, ttl=300)
+async def _do_extract(imdb_id: str, source: str) -> list[str]:
     """
-    Extract direct stream URL using intelligent M3U8 sniffer with Playwright
+    Sniff and rank stream URLs for an IMDB ID (successful results cached for 5 minutes)
     
-    Features:
-    - Network request interception
-    - Smart URL filtering and ranking
-    - Quality-based stream selection
-    - Duplicate detection
+    Concurrent callers for the same (imdb_id, source) share one in-flight
+    extraction. Raises LookupError when nothing is captured so that misses
+    are never cached.
     """
-    try:
-        # Validate IMDB ID
-        if not re.match(r'^tt\d+$', imdb_id):
-            raise HTTPException(status_code=400, detail="Invalid IMDB ID format")
-        
-        embed_url = get_embed_url_for_source(source, imdb_id)
-        
-        from playwright.async_api import async_playwright
+    embed_url = get_embed_url_for_source(source, imdb_id)
+    
+    # Anti-detection: Randomize to avoid fingerprinting
+    user_agents = [
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15',
+    ]
+    
+    async def _one_attempt(attempt: int, user_agent: str) -> list[tuple[int, str]]:
+        """Sniff one fresh browser context; returns the top-ranked (score, url) candidates"""
+        print(f"🔄 Extraction attempt {attempt}...")
         
-        # Smart M3U8 Sniffer
-        captured_urls = []
+        # Smart M3U8 Sniffer: dedupe on capture, keep a bounded min-heap of the top-ranked URLs
+        seen: set[str] = set()
+        top: list[tuple[int, str]] = []
         
-        def is_valid_stream_url(url: str) -> bool:
-            """Filter out invalid/junk URLs"""
-            url_lower = url.lower()
-            
-            # Reject patterns
-            reject_patterns = [
-                'blob:', 'data:', 'chrome-extension:',
-                'about:', 'javascript:',
-                '.js', '.css', '.json', '.xml',
-                '.woff', '.ttf', '.svg', '.ico',
-                '/api/', '/track', '/log', '/analytics',
-                'google', 'facebook', 'tracker'
-            ]
-            
-            if any(pattern in url_lower for pattern in reject_patterns):
-                return False
-            
-            # Accept patterns
-            accept_patterns = ['.m3u8', '.mp4', '.mkv', '.webm', '.ts']
-            
-            return any(pattern in url_lower for pattern in accept_patterns)
+        # Fresh context on the shared browser
+        browser = await get_browser()
+        context = await browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=user_agent,
+            locale='en-US',
+            timezone_id='America/New_York',
+            storage_state=None,
+            java_script_enabled=True,
+        )
         
-        def rank_stream_url(url: str) -> int:
-            """Rank stream URLs by quality indicators (higher = better)"""
-            score = 0
-            url_lower = url.lower()
-            
-            # Prefer M3U8 (adaptive streaming)
-            if '.m3u8' in url_lower:
-                score += 100
-                
-                # Quality indicators in M3U8
-                if 'master' in url_lower or 'playlist' in url_lower:
-                    score += 50
-                if '1080' in url_lower or 'fhd' in url_lower:
-                    score += 30
-                elif '720' in url_lower or 'hd' in url_lower:
-                    score += 20
-                elif '480' in url_lower:
-                    score += 10
-            
-            # MP4 is good but less flexible
-            elif '.mp4' in url_lower:
-                score += 80
-                if '1080' in url_lower:
-                    score += 25
-                elif '720' in url_lower:
-                    score += 15
-            
-            # Other formats
-            elif '.mkv' in url_lower:
-                score += 70
-            elif '.webm' in url_lower:
-                score += 60
-            elif '.ts' in url_lower:
-                score += 40  # Transport stream segments
-            
-            # CDN/reliable hosts (bonus points)
-            reliable_hosts = ['cloudflare', 'akamai', 'fastly', 'bunny', 'cloudfront']
-            if any(host in url_lower for host in reliable_hosts):
-                score += 20
-            
-            # Long URLs often indicate proper streams
-            if len(url) > 100:
-                score += 10
+        try:
+            # Manual stealth - hide automation
+            await context.add_init_script("""
+                Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+                Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+                Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
+                window.chrome = {runtime: {}};
+            """)
             
-            return score
-        
-        # Anti-detection: Randomize to avoid fingerprinting
-        import random
-        import os
-        
-        user_agents = [
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15',
-        ]
-        
-        # Retry logic for better reliability
-        max_retries = 2
-        for attempt in range(max_retries):
-            print(f"🔄 Extraction attempt {attempt + 1}/{max_retries}...")
+            page = await context.new_page()
+            await page.route('**/*', block_unneeded_resources)
             
-            captured_urls = []
-            har_path = f"/tmp/lonelymovie_requests_{imdb_id}_{attempt}.har"
+            # Sniff stream URLs live from the request event (no HAR round-trip)
+            page.on('request', lambda request: record_stream_candidate(request.url, seen, top))
             
             try:
-                async with async_playwright() as p:
-                    browser = await p.chromium.launch(
-                        headless=True,
-                        args=[
-                            '--no-sandbox',
-                            '--disable-dev-shm-usage',
-                            '--disable-blink-features=AutomationControlled',
-                            '--disable-web-security',
-                            '--disable-features=IsolateOrigins,site-per-process',
-                        ]
-                    )
-                    
-                    # Fresh context with HAR recording enabled
-                    context = await browser.new_context(
-                        viewport={'width': 1920, 'height': 1080},
-                        user_agent=random.choice(user_agents),
-                        locale='en-US',
-                        timezone_id='America/New_York',
-                        storage_state=None,
-                        java_script_enabled=True,
-                        record_har_path=har_path,
-                        record_har_content='omit'
-                    )
-                    
-                    # Manual stealth - hide automation
-                    await context.add_init_script("""
-                        Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-                        Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
-                        Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
-                        window.chrome = {runtime: {}};
-                    """)
-                    
-                    page = await context.new_page()
-                    
-                    try:
-                        print(f"📡 Loading: {embed_url}")
-                        await page.goto(embed_url, wait_until='domcontentloaded', timeout=20000)
-                        
-                        # Random delay
-                        await page.wait_for_timeout(random.randint(2000, 4000))
-                        
-                        print("🎬 Looking for play button...")
-                        play_clicked = False
-                        
-                        play_selectors = [
-                            'button.vjs-big-play-button',
-                            '.vjs-big-play-button',
-                            'button[aria-label*="Play" i]',
-                            'button[aria-label*="play" i]',
-                            '.plyr__control--overlaid',
-                            'button.play-button',
-                            'button.play',
-                            '.play-overlay',
-                            '[class*="play"][class*="button"]',
-                            'video',
-                        ]
-                        
-                        for selector in play_selectors:
-                            try:
-                                element = await page.query_selector(selector)
-                                if element:
-                                    print(f"  ✓ Found: {selector}")
-                                    await element.click(timeout=2000)
-                                    play_clicked = True
-                                    break
-                            except:
-                                continue
-                        
-                        if not play_clicked:
-                            try:
-                                print("  → Clicking center of page...")
-                                await page.mouse.click(960, 540)
-                                play_clicked = True
-                            except:
-                                pass
-                        
-                        if play_clicked:
-                            print("✅ Play button clicked!")
-                            await page.wait_for_timeout(8000)
-                            print("⏳ Waiting for stream requests...")
-                            await page.wait_for_timeout(5000)
-                        else:
-                            print("⚠️ Could not click play, waiting anyway...")
-                            await page.wait_for_timeout(10000)
-                            
-                    except Exception as e:
-                        print(f"⚠️ Page error: {e}")
-                    finally:
-                        await context.close()
-                        await browser.close()
+                print(f"📡 Loading: {embed_url}")
+                await page.goto(embed_url, wait_until='domcontentloaded', timeout=20000)
+                
+                # Random delay
+                await page.wait_for_timeout(random.randint(2000, 4000))
+                
+                print("🎬 Looking for play button...")
+                play_clicked = False
                 
-                # Parse HAR
-                if os.path.exists(har_path):
+                try:
+                    handle = await page.evaluate_handle(FIND_PLAY_BUTTON_JS, PLAY_BUTTON_SELECTORS)
+                    element = handle.as_element()
+                    if element:
+                        print("  ✓ Found play button")
+                        await element.click(timeout=2000)
+                        play_clicked = True
+                except Exception:
+                    pass
+                
+                if not play_clicked:
                     try:
-                        import json
-                        with open(har_path, "r") as f:
-                            har_data = json.load(f)
-                        
-                        for entry in har_data.get("log", {}).get("entries", []):
-                            url = entry.get("request", {}).get("url", "")
-                            if is_valid_stream_url(url):
-                                captured_urls.append(url)
-                                
-                        # Cleanup HAR file
-                        os.remove(har_path)
-                    except Exception as e:
-                        print(f"⚠️ HAR parsing error: {e}")
+                        print("  → Clicking center of page...")
+                        await page.mouse.click(960, 540)
+                        play_clicked = True
+                    except Exception:
+                        pass
                 
-                if captured_urls:
-                    print(f"✅ Successful capture on attempt {attempt + 1}!")
-                    break
+                if play_clicked:
+                    print("✅ Play button clicked!")
+                    await page.wait_for_timeout(8000)
+                    print("⏳ Waiting for stream requests...")
+                    await page.wait_for_timeout(5000)
                 else:
-                    print(f"❌ Failed attempt {attempt + 1}, retrying...")
-                    import asyncio
-                    await asyncio.sleep(2)
+                    print("⚠️ Could not click play, waiting anyway...")
+                    await page.wait_for_timeout(10000)
                     
             except Exception as e:
-                print(f"❌ Attempt {attempt + 1} failed with error: {e}")
-                import asyncio
-                await asyncio.sleep(2)
+                print(f"⚠️ Page error: {e}")
+        finally:
+            await context.close()
         
-        # Process results after retries
-        unique_urls = list(set(captured_urls))
-        ranked_urls = sorted(unique_urls, key=rank_stream_url, reverse=True)
+        return top
+    
+    # Race both attempts (different user agents) and keep the first one that captures streams
+    max_retries = 2
+    tasks = [
+        asyncio.create_task(_one_attempt(attempt + 1, user_agent))
+        for attempt, user_agent in enumerate(random.sample(user_agents, max_retries))
+    ]
+    top: list[tuple[int, str]] = []
+    pending = set(tasks)
+    while pending and not top:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        # Inspect every finished task (no early break) so no exception goes unretrieved
+        for task in done:
+            attempt = tasks.index(task) + 1
+            if task.exception():
+                print(f"❌ Attempt {attempt} failed with error: {task.exception()}")
+            elif task.result():
+                print(f"✅ Successful capture on attempt {attempt}!")
+                if not top:
+                    top = task.result()
+            else:
+                print(f"❌ Attempt {attempt} captured no streams")
+    
+    # Cancel the losing attempt and let it close its context
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    
+    # Process results after retries
+    ranked_urls = [url for _, url in sorted(top, reverse=True)]
+    
+    if not ranked_urls:
+        raise LookupError("No streams detected after retries")
+    
+    return ranked_urls
+
+
+@app.get("/api/extract-stream/{imdb_id}")
+async def extract_stream_url(imdb_id: str, source: str = "vidsrc.me"):
+    """
+    Extract direct stream URL using intelligent M3U8 sniffer with Playwright
+    
+    Features:
+    - Network request interception
+    - Smart URL filtering and ranking
+    - Quality-based stream selection
+    - Duplicate detection
+    """
+    try:
+        # Validate IMDB ID
+        if not _IMDB_ID_RE.match(imdb_id):
+            raise HTTPException(status_code=400, detail="Invalid IMDB ID format")
         
-        if not ranked_urls:
+        try:
+            # One extraction per (imdb_id, source) at a time; hits are served from cache
+            ranked_urls = await _do_extract(imdb_id, source)
+        except LookupError as no_streams:
             return {
                 "stream_url": None,
                 "type": "iframe",
-                "message": "No streams detected after retries"
+                "message": str(no_streams)
             }
             
         print(f"🏆 Best stream: {ranked_urls[0][:100]}...")
@@ -528,7 +610,6 @@ async def extract_stream_url(imdb_id: str, source: str = "vidsrc.me"):
     
     except Exception as e:
         print(f"❌ Extraction error: {str(e)}")
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Extraction failed: {str(e)}")
 
@@ -544,11 +625,6 @@ def get_embed_url_for_source(source: str, imdb_id: str) -> str:
     }
     return urls.get(source, urls['vidsrc.me'])
 
-# Serve React Frontend (Static Files)
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-import os
-
 # API Health Check
 @app.get("/api")
 async def api_root():
@@ -563,25 +639,14 @@ async def api_root():
         }
     }
 
+# Serve React Frontend (Static Files)
 # Mount static files if directory exists (Docker/Production)
 static_dir = "static"
 if os.path.exists(static_dir):
     app.mount("/assets", StaticFiles(directory=f"{static_dir}/assets"), name="assets")
     
-    # Explicit route for root to serve index.html
-    @app.get("/")
-    async def serve_root():
-        return FileResponse(f"{static_dir}/index.html")
-
-    # Catch-all route for SPA (React Router) - catch everything else
-    @app.get("/{full_path:path}")
-    async def serve_react_app(full_path: str):
-        # Allow API calls to pass through
-        if full_path.startswith("api/"):
-            raise HTTPException(status_code=404, detail="API endpoint not found")
-            
-        # Serve index.html for all other routes
-        return FileResponse(f"{static_dir}/index.html")
+    # SPA (and favicon etc.) served straight from disk; mounted last so API routes win
+    app.mount("/", StaticFiles(directory=static_dir, html=True), name="spa")
 
 if __name__ == "__main__":
     import uvicorn